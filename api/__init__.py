@@ -1,3 +1,4 @@
 # API package
 
 from .routes import *
+from .debug import *
@@ -0,0 +1,98 @@
+"""
+诊断接口定义（仅在 DEBUG_ENDPOINTS=true 时注册）
+"""
+import hmac
+import logging
+from flask import Blueprint, request
+
+from const import *
+from utils import R
+from utils.diagnostics import (
+    sample_stacks, memory_start, memory_stop, memory_status,
+    memory_snapshot, memory_diff, thread_states,
+)
+
+logger = logging.getLogger(__name__)
+
+# 创建蓝图
+debug_bp = Blueprint('debug', __name__, url_prefix='/debug')
+
+
+@debug_bp.before_request
+def check_token():
+    """校验诊断接口令牌（需携带 X-Debug-Token 请求头，未配置DEBUG_TOKEN时一律拒绝）"""
+    if not DEBUG_TOKEN or not hmac.compare_digest(request.headers.get('X-Debug-Token', ''), DEBUG_TOKEN):
+        return R.error(UNAUTHORIZED, '诊断接口令牌无效').response(), 401
+    return None
+
+
+@debug_bp.route('/profile', methods=['GET'])
+def profile():
+    """
+    采样剖析接口，对线上流量采样N秒，返回折叠栈（可直接用于生成火焰图）
+    请求参数:
+    - seconds: 采样时长（可选，默认10）
+    - interval: 采样间隔秒数（可选，默认0.005）
+    """
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        interval = float(request.args.get('interval', 0.005))
+        if not 0 < seconds <= PROFILE_MAX_SECONDS:
+            return R.error(PARAM_ERROR, f'seconds 取值范围为 (0, {PROFILE_MAX_SECONDS}]').response()
+        if interval <= 0:
+            return R.error(PARAM_ERROR, 'interval 必须大于0').response()
+
+        result = sample_stacks(seconds, interval)
+        if result is None:
+            return R.error(SERVICE_ERROR, '已有采样任务正在运行').response()
+
+        return R.ok(data=result).response()
+    except Exception as e:
+        logger.error(f"采样剖析接口错误: {e}", exc_info=True)
+        return R.error(PARAM_ERROR, str(e)).response()
+
+
+@debug_bp.route('/memory', methods=['GET', 'POST'])
+def memory():
+    """
+    内存诊断接口（tracemalloc）
+    请求参数:
+    - action: status（默认）、start、snapshot、diff、stop
+    - frames: start时保留的栈深度（可选，默认10）
+    - limit: 返回条数（可选，默认20）
+    - key_type: 统计方式 lineno、filename、traceback（可选，默认lineno）
+    - filter: 文件名过滤（可选），如 "*/core/captcha.py"
+    """
+    try:
+        action = request.values.get('action', 'status')
+        limit = int(request.values.get('limit', 20))
+        key_type = request.values.get('key_type', 'lineno')
+        filter_pattern = request.values.get('filter') or None
+
+        if action == 'status':
+            result = memory_status()
+        elif action == 'start':
+            result = memory_start(int(request.values.get('frames', 10)))
+        elif action == 'stop':
+            result = memory_stop()
+        elif action == 'snapshot':
+            result = memory_snapshot(limit, key_type, filter_pattern)
+        elif action == 'diff':
+            result = memory_diff(limit, key_type, filter_pattern)
+        else:
+            return R.error(PARAM_ERROR, f'不支持的action: {action}').response()
+
+        return R.ok(data=result).response()
+    except Exception as e:
+        logger.error(f"内存诊断接口错误: {e}", exc_info=True)
+        return R.error(PARAM_ERROR, str(e)).response()
+
+
+@debug_bp.route('/threads', methods=['GET'])
+def threads():
+    """线程状态接口，返回所有线程的状态和调用栈"""
+    try:
+        return R.ok(data=thread_states()).response()
+    except Exception as e:
+        logger.error(f"线程状态接口错误: {e}", exc_info=True)
+        return R.error(INTERNAL_ERROR, str(e)).response()
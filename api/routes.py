@@ -2,11 +2,11 @@
 API路由定义
 """
 import logging
-from flask import Blueprint, request
+from flask import Blueprint
 
 from core import CAPTCHA
 from const import *
-from utils import R
+from utils import R, get_request_data
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +20,16 @@ captcha: CAPTCHA = None
 def init_routes():
     """初始化路由，注入CAPTCHA实例"""
     global captcha
-    captcha = CAPTCHA(ocr_beta=OCR_BETA, det_beta=DET_BETA, show_ad=SHOW_AD)
+    captcha = CAPTCHA(ocr_beta=OCR_BETA, det_beta=DET_BETA, show_ad=SHOW_AD,
+                      model_dir=MODEL_DIR, model_memory_budget=MODEL_MEMORY_BUDGET * 1024 * 1024,
+                      slide_cache_size=SLIDE_CACHE_SIZE * 1024 * 1024, model_cache_dir=MODEL_CACHE_DIR)
+
+
+def check_model(model):
+    """校验自定义模型参数，模型不存在时返回错误响应"""
+    if model and not captcha.models.exists(model):
+        return R.error(PARAM_ERROR, f'模型不存在: {model}').response()
+    return None
 
 
 @api_bp.route('/capcode', methods=['POST'])
@@ -33,9 +42,9 @@ def capcode():
     - simpleTarget: 是否使用简单目标模式（可选，默认true）
     """
     try:
-        data = request.get_json()
+        data = get_request_data()
         if not data or 'slidingImage' not in data or 'backImage' not in data:
-            return R.error(PARAM_ERROR, '缺少必需参数: slidingImage, backImage').json()
+            return R.error(PARAM_ERROR, '缺少必需参数: slidingImage, backImage').response()
 
         sliding_image = data['slidingImage']
         back_image = data['backImage']
@@ -44,12 +53,12 @@ def capcode():
         result = captcha.capcode(sliding_image, back_image, simple_target)
         if result is None:
             logger.error('滑块识别过程中出现错误')
-            return R.error(SERVICE_ERROR, '滑块识别过程中出现错误').json()
+            return R.error(SERVICE_ERROR, '滑块识别过程中出现错误').response()
 
-        return R.ok(data=result).json()
+        return R.ok(data=result).response()
     except Exception as e:
         logger.error(f"滑块识别接口错误: {e}", exc_info=True)
-        return R.error(PARAM_ERROR, str(e)).json()
+        return R.error(PARAM_ERROR, str(e)).response()
 
 
 @api_bp.route('/slideComparison', methods=['POST'])
@@ -61,9 +70,9 @@ def slide_comparison():
     - backImage: 背景图片（必需）
     """
     try:
-        data = request.get_json()
+        data = get_request_data()
         if not data or 'slidingImage' not in data or 'backImage' not in data:
-            return R.error(PARAM_ERROR, '缺少必需参数: slidingImage, backImage').json()
+            return R.error(PARAM_ERROR, '缺少必需参数: slidingImage, backImage').response()
 
         sliding_image = data['slidingImage']
         back_image = data['backImage']
@@ -71,12 +80,12 @@ def slide_comparison():
         result = captcha.slide_comparison(sliding_image, back_image)
         if result is None:
             logger.error('滑块对比过程中出现错误')
-            return R.error(SERVICE_ERROR, '滑块对比过程中出现错误').json()
+            return R.error(SERVICE_ERROR, '滑块对比过程中出现错误').response()
 
-        return R.ok(data=result).json()
+        return R.ok(data=result).response()
     except Exception as e:
         logger.error(f"滑块对比接口错误: {e}", exc_info=True)
-        return R.error(PARAM_ERROR, str(e)).json()
+        return R.error(PARAM_ERROR, str(e)).response()
 
 
 @api_bp.route('/classification', methods=['POST'])
@@ -89,37 +98,44 @@ def classification():
     - probability: 是否返回识别概率（可选，默认false）
     - color_filter_colors: 颜色过滤列表（可选），如 ["red", "blue"] 或 [[[0,50,50],[10,255,255]]]
     - charset_ranges: 字符集限制（可选），如 "0123456789+-x/="
+    - model: 自定义模型名称（可选，默认使用内置模型）
     """
     try:
-        data = request.get_json()
+        data = get_request_data()
         if not data or 'image' not in data:
-            return R.error(PARAM_ERROR, '缺少必需参数: image').json()
+            return R.error(PARAM_ERROR, '缺少必需参数: image').response()
 
         image = data['image']
         png_fix = data.get('png_fix', False)
         probability = data.get('probability', False)
         color_filter_colors = data.get('color_filter_colors', None)
         charset_ranges = data.get('charset_ranges', None)
+        model = data.get('model', None)
+
+        error = check_model(model)
+        if error:
+            return error
 
         # 如果提供了字符集，先设置
         if charset_ranges:
-            captcha.set_ranges(charset_ranges)
+            captcha.set_ranges(charset_ranges, model=model)
 
         result = captcha.classification(
             image,
             png_fix=png_fix,
             probability=probability,
-            color_filter_colors=color_filter_colors
+            color_filter_colors=color_filter_colors,
+            model=model
         )
 
         if result is None:
             logger.error('OCR识别过程中出现错误')
-            return R.error(SERVICE_ERROR, 'OCR识别过程中出现错误').json()
+            return R.error(SERVICE_ERROR, 'OCR识别过程中出现错误').response()
 
-        return R.ok(data=result).json()
+        return R.ok(data=result).response()
     except Exception as e:
         logger.error(f"OCR识别接口错误: {e}", exc_info=True)
-        return R.error(PARAM_ERROR, str(e)).json()
+        return R.error(PARAM_ERROR, str(e)).response()
 
 
 @api_bp.route('/detection', methods=['POST'])
@@ -130,21 +146,21 @@ def detection():
     - image: 图片数据（必需）
     """
     try:
-        data = request.get_json()
+        data = get_request_data()
         if not data or 'image' not in data:
-            return R.error(PARAM_ERROR, '缺少必需参数: image').json()
+            return R.error(PARAM_ERROR, '缺少必需参数: image').response()
 
         image = data['image']
         result = captcha.detection(image)
 
         if result is None:
             logger.error('目标检测过程中出现错误')
-            return R.error(SERVICE_ERROR, '目标检测过程中出现错误').json()
+            return R.error(SERVICE_ERROR, '目标检测过程中出现错误').response()
 
-        return R.ok(data=result).json()
+        return R.ok(data=result).response()
     except Exception as e:
         logger.error(f"目标检测接口错误: {e}", exc_info=True)
-        return R.error(PARAM_ERROR, str(e)).json()
+        return R.error(PARAM_ERROR, str(e)).response()
 
 
 @api_bp.route('/calculate', methods=['POST'])
@@ -154,24 +170,31 @@ def calculate():
     请求参数:
     - image: 图片数据（必需）
     - charset_ranges: 字符集限制（可选），如 "0123456789+-x/="
+    - model: 自定义模型名称（可选，默认使用内置模型）
     """
     try:
-        data = request.get_json()
+        data = get_request_data()
         if not data or 'image' not in data:
-            return R.error(PARAM_ERROR, '缺少必需参数: image').json()
+            return R.error(PARAM_ERROR, '缺少必需参数: image').response()
 
         image = data['image']
         charset_ranges = data.get('charset_ranges', None)
-        result = captcha.calculate(image, charset_ranges=charset_ranges)
+        model = data.get('model', None)
+
+        error = check_model(model)
+        if error:
+            return error
+
+        result = captcha.calculate(image, charset_ranges=charset_ranges, model=model)
 
         if result is None:
             logger.error('计算验证码过程中出现错误')
-            return R.error(SERVICE_ERROR, '计算验证码过程中出现错误').json()
+            return R.error(SERVICE_ERROR, '计算验证码过程中出现错误').response()
 
-        return R.ok(data=result).json()
+        return R.ok(data=result).response()
     except Exception as e:
         logger.error(f"计算验证码接口错误: {e}", exc_info=True)
-        return R.error(PARAM_ERROR, str(e)).json()
+        return R.error(PARAM_ERROR, str(e)).response()
 
 
 @api_bp.route('/crop', methods=['POST'])
@@ -183,9 +206,9 @@ def crop():
     - y_coordinate: Y坐标分割点（必需）
     """
     try:
-        data = request.get_json()
+        data = get_request_data()
         if not data or 'image' not in data or 'y_coordinate' not in data:
-            return R.error(PARAM_ERROR, '缺少必需参数: image, y_coordinate').json()
+            return R.error(PARAM_ERROR, '缺少必需参数: image, y_coordinate').response()
 
         image = data['image']
         y_coordinate = int(data['y_coordinate'])
@@ -193,12 +216,12 @@ def crop():
         result = captcha.crop(image, y_coordinate)
         if result is None:
             logger.error('图片分割过程中出现错误')
-            return R.error(SERVICE_ERROR, '图片分割过程中出现错误').json()
+            return R.error(SERVICE_ERROR, '图片分割过程中出现错误').response()
 
-        return R.ok(data=result).json()
+        return R.ok(data=result).response()
     except Exception as e:
         logger.error(f"图片分割接口错误: {e}", exc_info=True)
-        return R.error(PARAM_ERROR, str(e)).json()
+        return R.error(PARAM_ERROR, str(e)).response()
 
 
 @api_bp.route('/select', methods=['POST'])
@@ -207,23 +230,30 @@ def select():
     点选验证码接口
     请求参数:
     - image: 图片数据（必需）
+    - model: 文字识别使用的自定义模型名称（可选，默认使用内置模型）
     """
     try:
-        data = request.get_json()
+        data = get_request_data()
         if not data or 'image' not in data:
-            return R.error(PARAM_ERROR, '缺少必需参数: image').json()
+            return R.error(PARAM_ERROR, '缺少必需参数: image').response()
 
         image = data['image']
-        result = captcha.select(image)
+        model = data.get('model', None)
+
+        error = check_model(model)
+        if error:
+            return error
+
+        result = captcha.select(image, model=model)
 
         if result is None:
             logger.error('点选验证码处理过程中出现错误')
-            return R.error(SERVICE_ERROR, '点选验证码处理过程中出现错误').json()
+            return R.error(SERVICE_ERROR, '点选验证码处理过程中出现错误').response()
 
-        return R.ok(data=result).json()
+        return R.ok(data=result).response()
     except Exception as e:
         logger.error(f"点选验证码接口错误: {e}", exc_info=True)
-        return R.error(PARAM_ERROR, str(e)).json()
+        return R.error(PARAM_ERROR, str(e)).response()
 
 
 @api_bp.route('/set_ranges', methods=['POST'])
@@ -232,22 +262,39 @@ def set_ranges():
     设置OCR字符集范围接口
     请求参数:
     - ranges: 字符集字符串，如 "0123456789+-x/="
+    - model: 自定义模型名称（可选，默认使用内置模型）
     """
     try:
-        data = request.get_json()
+        data = get_request_data()
         if not data or 'ranges' not in data:
-            return R.error(PARAM_ERROR, '缺少必需参数: ranges').json()
+            return R.error(PARAM_ERROR, '缺少必需参数: ranges').response()
 
         ranges = data['ranges']
-        captcha.set_ranges(ranges)
-        return R.ok(data=ranges, msg='字符集范围设置成功').json()
+        model = data.get('model', None)
+
+        error = check_model(model)
+        if error:
+            return error
+
+        captcha.set_ranges(ranges, model=model)
+        return R.ok(data=ranges, msg='字符集范围设置成功').response()
     except Exception as e:
         logger.error(f"设置字符集范围接口错误: {e}", exc_info=True)
-        return R.error(PARAM_ERROR, str(e)).json()
+        return R.error(PARAM_ERROR, str(e)).response()
+
+
+@api_bp.route('/models', methods=['GET'])
+def models():
+    """自定义模型列表接口，返回模型目录下所有模型及其加载状态"""
+    try:
+        return R.ok(data=captcha.models.status()).response()
+    except Exception as e:
+        logger.error(f"模型列表接口错误: {e}", exc_info=True)
+        return R.error(SERVICE_ERROR, str(e)).response()
 
 
 @api_bp.route('/health', methods=['GET'])
 @api_bp.route('/status', methods=['GET'])
 def health_check():
     """健康检查接口"""
-    return R.ok(data={'status': 'running', 'version': '1.0.0'}, msg='API运行成功！').json()
+    return R.ok(data={'status': 'running', 'version': '1.0.0'}, msg='API运行成功！').response()
@@ -6,7 +6,7 @@ import logging
 from flask import Flask
 from flask_cors import CORS
 
-from api import api_bp, init_routes
+from api import api_bp, debug_bp, init_routes
 from const import *
 from utils import R
 
@@ -24,8 +24,8 @@ logger = logging.getLogger(__name__)
 # 创建Flask应用
 app = Flask(__name__)
 
-# 允许跨域请求
-CORS(app)
+# 允许跨域请求（诊断接口除外，避免任意网页跨域调用）
+CORS(app, resources={r'^(?!/debug(/|$)).*': {}})
 
 # 初始化路由
 init_routes()
@@ -33,6 +33,13 @@ init_routes()
 # 注册蓝图
 app.register_blueprint(api_bp)
 
+# 诊断接口默认关闭，未开启时不注册任何路由；未配置令牌时拒绝开启
+if DEBUG_ENDPOINTS and not DEBUG_TOKEN:
+    logger.error("诊断接口未开启: DEBUG_ENDPOINTS=true 时必须设置 DEBUG_TOKEN")
+elif DEBUG_ENDPOINTS:
+    app.register_blueprint(debug_bp)
+    logger.warning("诊断接口已开启: /debug/profile, /debug/memory, /debug/threads")
+
 
 # 根路径健康检查
 @app.route('/', methods=['GET'])
@@ -41,19 +48,19 @@ def index():
     return R.ok(data={
         'status': 'running',
         'version': '1.0.0'
-    }, msg='API运行成功！').json()
+    }, msg='API运行成功！').response()
 
 
 # 错误处理
 @app.errorhandler(404)
 def not_found(error):
-    return R.error(NOT_FOUND, '接口不存在').json(), 404
+    return R.error(NOT_FOUND, '接口不存在').response(), 404
 
 
 @app.errorhandler(500)
 def internal_error(error):
     logger.error(f"服务器内部错误: {error}", exc_info=True)
-    return R.error(INTERNAL_ERROR, '服务器内部错误').json(), 500
+    return R.error(INTERNAL_ERROR, '服务器内部错误').response(), 500
 
 
 # 启动应用
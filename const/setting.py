@@ -12,7 +12,22 @@ DEBUG = os.getenv('DEBUG', 'false').lower() == 'true'
 OCR_BETA = os.getenv('OCR_BETA', 'true').lower() == 'true'
 DET_BETA = os.getenv('DET_BETA', 'true').lower() == 'true'
 SHOW_AD = os.getenv('SHOW_AD', 'false').lower() == 'true'
+MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', '')  # 优化模型缓存目录，为空时不启用
+
+# 自定义模型配置（目录下每个模型为 <name>.onnx + <name>.json，按需加载）
+MODEL_DIR = os.getenv('MODEL_DIR', 'models')
+# 已加载模型的文件总大小预算（单位MB，0表示不限制），超出时淘汰最久未使用的空闲模型；
+# onnxruntime实际内存占用通常是模型文件大小的数倍
+MODEL_MEMORY_BUDGET = int(os.getenv('MODEL_MEMORY_BUDGET', 0))
+
+# 滑块背景图解码缓存（按内容哈希，LRU淘汰）
+SLIDE_CACHE_SIZE = int(os.getenv('SLIDE_CACHE_SIZE', 64))  # 单位MB，0表示不缓存
 
 # 日志配置
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
 LOG_FILE = os.getenv('LOG_FILE', 'logs/app.log')
+
+# 诊断接口配置（默认关闭，开启后注册 /debug/* 接口）
+DEBUG_ENDPOINTS = os.getenv('DEBUG_ENDPOINTS', 'false').lower() == 'true'
+DEBUG_TOKEN = os.getenv('DEBUG_TOKEN', '')
+PROFILE_MAX_SECONDS = int(os.getenv('PROFILE_MAX_SECONDS', 60))
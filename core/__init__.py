@@ -1,3 +1,6 @@
 # Core package
 
 from .captcha import *
+from .registry import *
+from .image_cache import *
+from .session_cache import *
@@ -4,13 +4,17 @@ CAPTCHA 核心识别类
 import cv2
 import numpy as np
 import re
-import base64
+import time
 import logging
+from contextlib import contextmanager
 from io import BytesIO
 from PIL import Image
 import ddddocr
 
-from utils.image_utils import get_image_bytes, image_to_base64
+from utils.image_utils import get_image_bytes, image_to_bytes
+from .image_cache import ImageCache
+from .registry import ModelRegistry
+from .session_cache import SessionCache
 
 logger = logging.getLogger(__name__)
 
@@ -18,22 +22,49 @@ logger = logging.getLogger(__name__)
 class CAPTCHA:
     """验证码识别核心类"""
 
-    def __init__(self, ocr_beta=True, det_beta=True, show_ad=False):
+    def __init__(self, ocr_beta=True, det_beta=True, show_ad=False, model_dir=None, model_memory_budget=0,
+                 slide_cache_size=0, model_cache_dir=None):
         """
         初始化识别器
         :param ocr_beta: 是否使用OCR beta模型
         :param det_beta: 是否使用检测 beta模型
         :param show_ad: 是否显示广告（官方参数）
+        :param model_dir: 自定义OCR模型目录（按需加载）
+        :param model_memory_budget: 自定义模型文件总大小预算（字节），0表示不限制
+        :param slide_cache_size: 滑块背景图解码缓存大小（字节），0表示不缓存
+        :param model_cache_dir: 优化模型缓存目录，为空时不启用
         """
         try:
-            self.ocr = ddddocr.DdddOcr(ocr=True, beta=ocr_beta, show_ad=show_ad)
-            self.det = ddddocr.DdddOcr(det=True, beta=det_beta, show_ad=show_ad)
+            start = time.perf_counter()
+            self.session_cache = SessionCache(model_cache_dir)
+            with self.session_cache.patch():
+                self.ocr = ddddocr.DdddOcr(ocr=True, beta=ocr_beta, show_ad=show_ad)
+                ocr_loaded = time.perf_counter()
+                self.det = ddddocr.DdddOcr(det=True, beta=det_beta, show_ad=show_ad)
+                det_loaded = time.perf_counter()
+            self.models = ModelRegistry(model_dir, memory_budget=model_memory_budget, show_ad=show_ad,
+                                        session_cache=self.session_cache)
+            self.slide_cache = ImageCache(slide_cache_size)  # 滑块背景图解码缓存
+            self.slide_array_input = hasattr(self.ocr, 'slide_engine')  # ddddocr 1.6+ 滑块接口支持numpy数组输入
             self.charset_ranges = None  # 字符集限制
-            logger.info("CAPTCHA识别器初始化成功")
+            logger.info(f"CAPTCHA识别器初始化成功，耗时: OCR模型 {ocr_loaded - start:.2f}s, "
+                        f"检测模型 {det_loaded - ocr_loaded:.2f}s, 合计 {time.perf_counter() - start:.2f}s")
         except Exception as e:
             logger.error(f"CAPTCHA识别器初始化失败: {e}")
             raise
 
+    @contextmanager
+    def _ocr(self, model=None):
+        """
+        获取OCR实例
+        :param model: 自定义模型名称，为空时使用内置模型
+        """
+        if not model:
+            yield self.ocr
+        else:
+            with self.models.acquire(model) as ocr:
+                yield ocr
+
     def capcode(self, sliding_image, back_image, simple_target=True):
         """
         滑块验证码识别（匹配算法）
@@ -45,7 +76,7 @@ class CAPTCHA:
         try:
             sliding_bytes = get_image_bytes(sliding_image)
             back_bytes = get_image_bytes(back_image)
-            res = self.ocr.slide_match(sliding_bytes, back_bytes, simple_target=simple_target)
+            res = self.ocr.slide_match(sliding_bytes, self._slide_background(back_bytes), simple_target=simple_target)
             if isinstance(res, dict) and 'target' in res:
                 return res['target'][0] if isinstance(res['target'], list) else res['target']
             return res
@@ -63,7 +94,7 @@ class CAPTCHA:
         try:
             sliding_bytes = get_image_bytes(sliding_image)
             back_bytes = get_image_bytes(back_image)
-            res = self.ocr.slide_comparison(sliding_bytes, back_bytes)
+            res = self.ocr.slide_comparison(sliding_bytes, self._slide_background(back_bytes))
             if isinstance(res, dict) and 'target' in res:
                 return res['target'][0] if isinstance(res['target'], list) else res['target']
             return res
@@ -71,26 +102,46 @@ class CAPTCHA:
             logger.error(f"滑块对比错误: {e}", exc_info=True)
             return None
 
-    def set_ranges(self, ranges):
+    def _slide_background(self, back_bytes):
+        """
+        获取滑块背景图输入
+        ddddocr 1.6+ 的滑块接口支持直接传入numpy数组，此时按内容哈希缓存背景图的解码结果（RGB），
+        识别算法仍由ddddocr完成；旧版本只接受字节流，不使用缓存
+        """
+        if not self.slide_array_input:
+            return back_bytes
+        return self.slide_cache.get('rgb', back_bytes, self._decode_rgb)
+
+    @staticmethod
+    def _decode_rgb(image_bytes):
+        """解码为RGB数组（与ddddocr滑块接口内部的解码方式一致）"""
+        return np.array(Image.open(BytesIO(image_bytes)).convert('RGB'))
+
+    def set_ranges(self, ranges, model=None):
         """
         设置字符集范围
         :param ranges: 字符集字符串，如 "0123456789+-x/="
+        :param model: 自定义模型名称，为空时使用内置模型
         """
         try:
-            self.ocr.set_ranges(ranges)
-            self.charset_ranges = ranges
+            if model:
+                self.models.set_ranges(model, ranges)
+            else:
+                self.ocr.set_ranges(ranges)
+                self.charset_ranges = ranges
             logger.info(f"字符集范围已设置: {ranges}")
         except Exception as e:
             logger.error(f"设置字符集范围失败: {e}")
             raise
 
-    def classification(self, image, png_fix=False, probability=False, color_filter_colors=None):
+    def classification(self, image, png_fix=False, probability=False, color_filter_colors=None, model=None):
         """
         OCR识别函数
         :param image: 图片数据（支持URL、base64、bytes）
         :param png_fix: 是否启用PNG修复（针对某些PNG图片的兼容性修复）
         :param probability: 是否返回识别概率
         :param color_filter_colors: 颜色过滤列表，如 ["red", "blue"] 或自定义HSV范围
+        :param model: 自定义模型名称，为空时使用内置模型
         :return: 识别结果（字符串或包含概率的字典）
         """
         try:
@@ -101,16 +152,17 @@ class CAPTCHA:
                 image_bytes = self._apply_color_filter(image_bytes, color_filter_colors)
 
             # 调用OCR识别
-            if probability:
-                res = self.ocr.classification(image_bytes, probability=True)
-                if isinstance(res, dict):
-                    return res
+            with self._ocr(model) as ocr:
+                if probability:
+                    res = ocr.classification(image_bytes, probability=True)
+                    if isinstance(res, dict):
+                        return res
+                    else:
+                        # 如果没有返回字典格式，构造一个
+                        return {'text': res, 'probability': []}
                 else:
-                    # 如果没有返回字典格式，构造一个
-                    return {'text': res, 'probability': []}
-            else:
-                res = self.ocr.classification(image_bytes, png_fix=png_fix)
-                return res
+                    res = ocr.classification(image_bytes, png_fix=png_fix)
+                    return res
         except Exception as e:
             logger.error(f"OCR识别错误: {e}", exc_info=True)
             return None
@@ -179,16 +231,17 @@ class CAPTCHA:
         try:
             image_bytes = get_image_bytes(image)
             poses = self.det.detection(image_bytes)
-            return poses if poses else []
+            return [[int(v) for v in bbox] for bbox in poses] if poses else []
         except Exception as e:
             logger.error(f"目标检测错误: {e}", exc_info=True)
             return None
 
-    def calculate(self, image, charset_ranges=None):
+    def calculate(self, image, charset_ranges=None, model=None):
         """
         计算类验证码处理
         :param image: 图片数据
         :param charset_ranges: 字符集限制，如 "0123456789+-x/="
+        :param model: 自定义模型名称，为空时使用内置模型
         :return: 计算结果
         """
         try:
@@ -196,9 +249,10 @@ class CAPTCHA:
 
             # 如果提供了字符集，先设置
             if charset_ranges:
-                self.set_ranges(charset_ranges)
+                self.set_ranges(charset_ranges, model=model)
 
-            expression = self.ocr.classification(image_bytes)
+            with self._ocr(model) as ocr:
+                expression = ocr.classification(image_bytes)
             # 清理表达式
             expression = re.sub('=.*$', '', str(expression))
             expression = re.sub(r'[^0-9+\-*/()]', '', expression)
@@ -218,7 +272,7 @@ class CAPTCHA:
         图片分割处理
         :param image: 图片数据
         :param y_coordinate: Y坐标分割点
-        :return: 分割后的图片（base64格式）
+        :return: 分割后的图片字节流（JSON响应中输出为base64，MessagePack响应中为原始二进制）
         """
         try:
             image_bytes = get_image_bytes(image)
@@ -226,18 +280,19 @@ class CAPTCHA:
             # 分割图片
             upper_half = image.crop((0, 0, image.width, y_coordinate))
             lower_half = image.crop((0, y_coordinate * 2, image.width, image.height))
-            # 将分割后的图片转换为Base64编码
-            slidingImage = image_to_base64(upper_half)
-            backImage = image_to_base64(lower_half)
+            # 将分割后的图片编码为PNG字节流
+            slidingImage = image_to_bytes(upper_half)
+            backImage = image_to_bytes(lower_half)
             return {'slidingImage': slidingImage, 'backImage': backImage}
         except Exception as e:
             logger.error(f"图片分割错误: {e}", exc_info=True)
             return None
 
-    def select(self, image):
+    def select(self, image, model=None):
         """
         点选验证码处理
         :param image: 图片数据
+        :param model: 文字识别使用的自定义模型名称，为空时使用内置模型
         :return: 识别结果和坐标的列表
         """
         try:
@@ -252,16 +307,15 @@ class CAPTCHA:
 
             bboxes = self.det.detection(image_bytes)
             result_list = []
-            for bbox in bboxes:
-                x1, y1, x2, y2 = bbox
-                x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-                cropped_image = im[y1:y2, x1:x2]
-                # 将图像编码为内存中的字节流（如png格式）
-                _, buffer = cv2.imencode('.png', cropped_image)
-                # 将字节流转换为 Base64 编码
-                image_base64 = base64.b64encode(buffer).decode('utf-8')
-                result = self.ocr.classification(image_base64)
-                result_list.append({'text': result, 'bbox': bbox})
+            with self._ocr(model) as ocr:
+                for bbox in bboxes:
+                    x1, y1, x2, y2 = bbox
+                    x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+                    cropped_image = im[y1:y2, x1:x2]
+                    # 将图像编码为内存中的字节流（如png格式），直接交给OCR识别
+                    _, buffer = cv2.imencode('.png', cropped_image)
+                    result = ocr.classification(buffer.tobytes())
+                    result_list.append({'text': result, 'bbox': [x1, y1, x2, y2]})
 
             return result_list
         except Exception as e:
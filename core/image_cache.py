@@ -0,0 +1,56 @@
+"""
+预处理图片缓存
+按图片内容哈希缓存解码/预处理结果，LRU淘汰并限制内存占用
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+
+
+class ImageCache:
+    """预处理图片缓存"""
+
+    def __init__(self, max_bytes=0):
+        """
+        初始化缓存
+        :param max_bytes: 最大内存占用（字节），0表示不缓存
+        """
+        self.max_bytes = max_bytes
+        self._items: 'OrderedDict[tuple, np.ndarray]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, image_bytes: bytes, loader: Callable[[bytes], np.ndarray]) -> np.ndarray:
+        """
+        获取预处理结果，未命中时调用loader生成并缓存
+        :param kind: 预处理类型，同一图片不同预处理方式分别缓存
+        :param image_bytes: 原始图片字节流
+        :param loader: 预处理函数，输入图片字节流，返回numpy数组
+        :return: 预处理结果（只读）
+        """
+        if not self.max_bytes:
+            return loader(image_bytes)
+
+        key = (kind, hashlib.blake2b(image_bytes, digest_size=16).digest())
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+                return value
+
+        value = loader(image_bytes)
+        value.flags.writeable = False
+        if value.nbytes > self.max_bytes:
+            return value
+
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = value
+                self._size += value.nbytes
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= evicted.nbytes
+        return value
@@ -0,0 +1,173 @@
+"""
+自定义模型注册表
+按需加载 ddddocr 兼容的自定义ONNX模型，模型文件总大小超出预算时淘汰最久未使用的空闲模型
+"""
+import os
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List
+
+import ddddocr
+
+from .session_cache import SessionCache
+
+logger = logging.getLogger(__name__)
+
+# 模型名称只允许字母、数字、下划线、点和短横线，防止路径穿越
+MODEL_NAME_PATTERN = re.compile(r'^[\w-][\w.-]*$')
+
+
+class _ModelEntry:
+    """已加载的模型"""
+
+    def __init__(self, ocr, size):
+        self.ocr = ocr
+        self.size = size  # 模型文件大小（字节）
+        self.in_use = 0  # 正在使用该模型的请求数
+        self.last_used = time.monotonic()
+
+
+class ModelRegistry:
+    """
+    自定义模型注册表
+    模型目录下每个模型由 <name>.onnx 和 <name>.json（字符集）两个文件组成
+    """
+
+    def __init__(self, model_dir, memory_budget=0, show_ad=False, session_cache=None):
+        """
+        初始化注册表
+        :param model_dir: 模型目录
+        :param memory_budget: 已加载模型的文件总大小预算（字节），0表示不限制；
+                              onnxruntime实际内存占用通常是模型文件大小的数倍，需按实际情况预留
+        :param show_ad: 是否显示广告（官方参数）
+        :param session_cache: 优化模型缓存，为空时不启用
+        """
+        self.model_dir = model_dir
+        self.memory_budget = memory_budget
+        self.show_ad = show_ad
+        self.session_cache = session_cache or SessionCache()
+        self._models: 'OrderedDict[str, _ModelEntry]' = OrderedDict()
+        self._ranges: Dict[str, object] = {}  # 各模型的字符集范围，模型被淘汰后重新加载时恢复
+        self._loading: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _paths(self, name):
+        """获取模型文件和字符集文件路径"""
+        base = os.path.join(self.model_dir, name)
+        return f"{base}.onnx", f"{base}.json"
+
+    def exists(self, name) -> bool:
+        """
+        判断模型是否存在
+        :param name: 模型名称
+        """
+        if not isinstance(name, str) or not MODEL_NAME_PATTERN.match(name) or not self.model_dir:
+            return False
+        onnx_path, charsets_path = self._paths(name)
+        return os.path.isfile(onnx_path) and os.path.isfile(charsets_path)
+
+    def names(self) -> List[str]:
+        """获取模型目录下所有可用模型名称"""
+        if not self.model_dir or not os.path.isdir(self.model_dir):
+            return []
+        names = [f[:-len('.onnx')] for f in os.listdir(self.model_dir) if f.endswith('.onnx')]
+        return sorted(name for name in names if self.exists(name))
+
+    def status(self) -> List[Dict]:
+        """获取所有可用模型的加载状态"""
+        with self._lock:
+            now = time.monotonic()
+            loaded = {name: {
+                'size': entry.size,
+                'in_use': entry.in_use,
+                'idle_seconds': round(now - entry.last_used, 1),
+            } for name, entry in self._models.items()}
+        return [{'name': name, 'loaded': name in loaded, **loaded.get(name, {})} for name in self.names()]
+
+    @contextmanager
+    def acquire(self, name):
+        """
+        获取模型（首次使用时加载），使用期间该模型不会被淘汰
+        :param name: 模型名称
+        :return: ddddocr实例
+        """
+        entry = self._load(name)
+        try:
+            yield entry.ocr
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+
+    def set_ranges(self, name, ranges):
+        """
+        设置模型的字符集范围，模型被淘汰后重新加载时自动恢复
+        :param name: 模型名称
+        :param ranges: 字符集范围
+        """
+        with self.acquire(name) as ocr:
+            ocr.set_ranges(ranges)
+            with self._lock:
+                self._ranges[name] = ranges
+
+    def _touch(self, name, entry):
+        """标记模型被使用（需持有锁）"""
+        self._models.move_to_end(name)
+        entry.in_use += 1
+        entry.last_used = time.monotonic()
+        return entry
+
+    def _load(self, name) -> _ModelEntry:
+        """加载模型，同一模型并发请求只加载一次"""
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is not None:
+                return self._touch(name, entry)
+            load_lock = self._loading.setdefault(name, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(name)
+                if entry is not None:
+                    return self._touch(name, entry)
+
+            if not self.exists(name):
+                raise ValueError(f"模型不存在: {name}")
+
+            onnx_path, charsets_path = self._paths(name)
+            start = time.monotonic()
+            with self.session_cache.patch():
+                ocr = ddddocr.DdddOcr(show_ad=self.show_ad, import_onnx_path=onnx_path, charsets_path=charsets_path)
+            with self._lock:
+                ranges = self._ranges.get(name)
+            if ranges is not None:
+                ocr.set_ranges(ranges)
+            entry = _ModelEntry(ocr, os.path.getsize(onnx_path))
+            logger.info(f"模型已加载: {name}，耗时 {time.monotonic() - start:.2f}s")
+
+            with self._lock:
+                self._models[name] = entry
+                self._loading.pop(name, None)
+                self._touch(name, entry)
+                self._evict()
+            return entry
+
+    def _evict(self):
+        """淘汰最久未使用的空闲模型，直到模型文件总大小不超过预算（需持有锁）"""
+        if not self.memory_budget:
+            return
+        total = sum(entry.size for entry in self._models.values())
+        for name in list(self._models):
+            if total <= self.memory_budget:
+                break
+            entry = self._models[name]
+            if entry.in_use:
+                continue
+            del self._models[name]
+            total -= entry.size
+            logger.info(f"模型已淘汰: {name}")
+        if total > self.memory_budget:
+            logger.warning(f"模型文件总大小超出预算: {total} > {self.memory_budget}")
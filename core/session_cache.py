@@ -0,0 +1,178 @@
+"""
+优化模型缓存
+首次加载时将 onnxruntime 图优化后的模型保存到缓存目录，之后启动直接加载优化结果，跳过图优化
+"""
+import os
+import json
+import hashlib
+import logging
+import platform
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+import onnxruntime
+
+logger = logging.getLogger(__name__)
+
+# onnxruntime.InferenceSession 的替换状态：只有替换/恢复本身需要加锁，模型加载期间不持有锁
+_patch_lock = threading.Lock()
+_patch_depth = 0
+_original_session = None
+# 当前线程正在使用的缓存，不在 SessionCache.patch() 内的线程为None
+_local = threading.local()
+
+
+@lru_cache(maxsize=None)
+def _host_signature() -> str:
+    """主机CPU标识（架构 + CPU型号 + 指令集），ORT_ENABLE_ALL 优化结果与硬件相关，缓存需按主机区分"""
+    parts = [platform.machine()]
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key.strip() in ('model name', 'flags', 'Features', 'CPU part') and value.strip() not in parts:
+                    parts.append(value.strip())
+                if not line.strip() and len(parts) > 1:
+                    break  # 只读取第一个CPU
+    except OSError:
+        parts.append(platform.processor())
+    return '|'.join(parts)
+
+
+def _session_factory(path_or_bytes, sess_options=None, providers=None, provider_options=None, **kwargs):
+    """替换后的 InferenceSession：当前线程启用了缓存时经过缓存，否则直接调用原始实现"""
+    cache = getattr(_local, 'cache', None)
+    if cache is None:
+        return _original_session(path_or_bytes, sess_options, providers, provider_options, **kwargs)
+    return cache._create(_original_session, path_or_bytes, sess_options, providers, provider_options, **kwargs)
+
+
+class SessionCache:
+    """优化模型缓存"""
+
+    def __init__(self, cache_dir=None):
+        """
+        初始化缓存
+        :param cache_dir: 缓存目录，为空时不启用缓存
+        """
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @contextmanager
+    def patch(self):
+        """
+        在上下文内（当前线程）创建的 InferenceSession 均经过缓存（用于包裹 ddddocr 实例的创建）
+
+        ddddocr 在运行时通过 onnxruntime.InferenceSession 属性创建会话，没有提供传入会话选项的接口，
+        因此在加载期间替换该属性。替换是安全的：
+        - 是否使用缓存取决于线程局部变量，其他线程同时创建会话时直接调用原始实现，行为不变
+        - 替换按引用计数安装和恢复，锁只在安装/恢复时短暂持有，多个模型可以并发加载
+        """
+        global _patch_depth, _original_session
+        if not self.cache_dir:
+            yield
+            return
+
+        with _patch_lock:
+            if _patch_depth == 0:
+                _original_session = onnxruntime.InferenceSession
+                onnxruntime.InferenceSession = _session_factory
+            _patch_depth += 1
+        previous = getattr(_local, 'cache', None)
+        _local.cache = self
+        try:
+            yield
+        finally:
+            _local.cache = previous
+            with _patch_lock:
+                _patch_depth -= 1
+                if _patch_depth == 0:
+                    onnxruntime.InferenceSession = _original_session
+                    _original_session = None
+
+    def _model_hash(self, path) -> str:
+        """
+        模型文件哈希，按文件大小和修改时间缓存在旁路文件中，避免每次启动重新计算
+        :param path: 模型文件路径
+        """
+        stat = os.stat(path)
+        path_key = hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+        sidecar = os.path.join(self.cache_dir, f"{path_key}.hash.json")
+        try:
+            with open(sidecar, encoding='utf-8') as f:
+                info = json.load(f)
+            if info['size'] == stat.st_size and info['mtime_ns'] == stat.st_mtime_ns:
+                return info['sha256']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+        try:
+            tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}, f)
+            os.replace(tmp_path, sidecar)
+        except OSError as e:
+            logger.warning(f"模型哈希写入失败: {e}")
+        return sha256
+
+    def _key(self, path, level, providers):
+        """缓存键：模型内容哈希 + 运行时版本 + 执行后端 + 优化级别 + 主机CPU"""
+        digest = hashlib.sha256(self._model_hash(path).encode('utf-8'))
+        digest.update('|'.join([
+            onnxruntime.__version__,
+            str(providers or onnxruntime.get_available_providers()),
+            str(level),
+            _host_signature(),
+        ]).encode('utf-8'))
+        name = os.path.splitext(os.path.basename(path))[0]
+        return f"{name}-{digest.hexdigest()[:32]}"
+
+    def _create(self, original, path_or_bytes, sess_options, providers, provider_options, **kwargs):
+        """创建 InferenceSession，优先从缓存加载优化后的模型"""
+        if not isinstance(path_or_bytes, (str, os.PathLike)) or not os.path.isfile(path_or_bytes):
+            return original(path_or_bytes, sess_options, providers, provider_options, **kwargs)
+
+        name = os.path.basename(path_or_bytes)
+        options = sess_options or onnxruntime.SessionOptions()
+        level = options.graph_optimization_level
+        start = time.perf_counter()
+        try:
+            cache_path = os.path.join(self.cache_dir, self._key(path_or_bytes, level, providers) + '.onnx')
+        except OSError as e:
+            logger.warning(f"模型 {name} 缓存不可用，直接加载原始模型: {e}")
+            return original(path_or_bytes, sess_options, providers, provider_options, **kwargs)
+        hashed = time.perf_counter()
+
+        if os.path.isfile(cache_path):
+            try:
+                # 缓存中的模型已按相同优化级别在本机完成全部图优化，加载时跳过所有优化
+                options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL
+                session = original(cache_path, options, providers, provider_options, **kwargs)
+                logger.info(f"模型 {name} 从缓存加载: 哈希 {hashed - start:.3f}s, 加载 {time.perf_counter() - hashed:.3f}s")
+                return session
+            except Exception as e:
+                logger.warning(f"模型 {name} 缓存加载失败，重新优化: {e}")
+            finally:
+                options.graph_optimization_level = level
+
+        # 首次加载：正常优化原始模型，同时由 onnxruntime 将优化结果写入缓存
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        options.optimized_model_filepath = tmp_path
+        try:
+            session = original(path_or_bytes, options, providers, provider_options, **kwargs)
+        finally:
+            options.optimized_model_filepath = ''
+        try:
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"模型 {name} 缓存写入失败: {e}")
+        logger.info(f"模型 {name} 优化并写入缓存: 哈希 {hashed - start:.3f}s, 加载优化 {time.perf_counter() - hashed:.3f}s")
+        return session
@@ -0,0 +1,58 @@
+"""
+CAPTCHA 滑块接口测试：启用背景图缓存后，结果需与 ddddocr 官方接口一致
+"""
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+ddddocr = pytest.importorskip('ddddocr')
+
+from core import CAPTCHA
+
+
+def _encode(image):
+    return cv2.imencode('.png', image)[1].tobytes()
+
+
+def _slide_images(blur):
+    """生成固定的滑块图片：背景图、滑块（x=180，宽44）、带缺口的背景图"""
+    rng = np.random.default_rng(2025)
+    background = rng.integers(0, 256, (160, 320, 3), dtype=np.uint8)
+    background = cv2.GaussianBlur(background, (blur, blur), 0)
+    x, y, size = 180, 60, 44
+    piece = background[y:y + size, x:x + size].copy()
+    gap = background.copy()
+    gap[y:y + size, x:x + size] = 255 - gap[y:y + size, x:x + size]
+    return _encode(background), _encode(piece), _encode(gap)
+
+
+@pytest.fixture(scope='module')
+def captcha():
+    return CAPTCHA(slide_cache_size=16 * 1024 * 1024)
+
+
+@pytest.fixture(scope='module')
+def reference():
+    return ddddocr.DdddOcr(ocr=False, det=False, show_ad=False)
+
+
+def _expected(res):
+    return res['target'][0] if isinstance(res['target'], list) else res['target']
+
+
+@pytest.mark.parametrize('blur', [5, 31])
+@pytest.mark.parametrize('simple_target', [True, False])
+def test_capcode_matches_ddddocr(captcha, reference, blur, simple_target):
+    background, piece, _ = _slide_images(blur)
+    expected = _expected(reference.slide_match(piece, background, simple_target=simple_target))
+    # 第二次调用命中缓存
+    for _ in range(2):
+        assert captcha.capcode(piece, background, simple_target) == expected
+
+
+@pytest.mark.parametrize('blur', [5, 31])
+def test_slide_comparison_matches_ddddocr(captcha, reference, blur):
+    background, _, gap = _slide_images(blur)
+    expected = _expected(reference.slide_comparison(gap, background))
+    for _ in range(2):
+        assert captcha.slide_comparison(gap, background) == expected
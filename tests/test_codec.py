@@ -0,0 +1,62 @@
+"""
+JSON/MessagePack 内容协商测试
+"""
+import pytest
+
+msgpack = pytest.importorskip('msgpack')
+flask = pytest.importorskip('flask')
+
+from utils import R, get_request_data, MSGPACK_MIMETYPE
+
+
+@pytest.fixture(scope='module')
+def client():
+    app = flask.Flask(__name__)
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        data = get_request_data()
+        return R.ok(data={'image': data['image'], 'bbox': [[1, 2, 300, 400]]}).response()
+
+    return app.test_client()
+
+
+def _post(client, body, content_type, accept=None):
+    headers = {'Content-Type': content_type}
+    if accept:
+        headers['Accept'] = accept
+    return client.post('/echo', data=body, headers=headers)
+
+
+def test_msgpack_request_without_accept_returns_msgpack(client):
+    body = msgpack.packb({'image': b'\x89PNG'}, use_bin_type=True)
+    resp = _post(client, body, MSGPACK_MIMETYPE)
+    assert resp.mimetype == MSGPACK_MIMETYPE
+    assert msgpack.unpackb(resp.data, raw=False) == {
+        'code': 0, 'msg': 'success', 'data': {'image': b'\x89PNG', 'bbox': [[1, 2, 300, 400]]}
+    }
+
+
+@pytest.mark.parametrize('accept', ['*/*', MSGPACK_MIMETYPE])
+def test_msgpack_request_with_accept(client, accept):
+    body = msgpack.packb({'image': b'\x89PNG'}, use_bin_type=True)
+    assert _post(client, body, MSGPACK_MIMETYPE, accept).mimetype == MSGPACK_MIMETYPE
+
+
+def test_msgpack_request_accept_json(client):
+    body = msgpack.packb({'image': b'\x89PNG'}, use_bin_type=True)
+    resp = _post(client, body, MSGPACK_MIMETYPE, 'application/json')
+    assert resp.mimetype == 'application/json'
+    assert resp.get_json()['data']['image'] == 'iVBORw=='
+
+
+@pytest.mark.parametrize('accept', [None, '*/*'])
+def test_json_request_returns_json(client, accept):
+    resp = _post(client, '{"image": "x"}', 'application/json', accept)
+    assert resp.mimetype == 'application/json'
+    assert resp.get_json()['data']['image'] == 'x'
+
+
+def test_json_request_accept_msgpack(client):
+    resp = _post(client, '{"image": "x"}', 'application/json', MSGPACK_MIMETYPE)
+    assert resp.mimetype == MSGPACK_MIMETYPE
@@ -0,0 +1,65 @@
+"""
+自定义模型注册表测试
+"""
+import pytest
+
+pytest.importorskip('ddddocr')
+
+from core import registry as registry_module
+from core.registry import ModelRegistry
+
+
+class FakeOcr:
+    """记录加载次数和字符集范围的假模型"""
+    loads = []
+
+    def __init__(self, import_onnx_path='', **kwargs):
+        self.path = import_onnx_path
+        self.ranges = None
+        FakeOcr.loads.append(import_onnx_path)
+
+    def set_ranges(self, ranges):
+        self.ranges = ranges
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry_module.ddddocr, 'DdddOcr', FakeOcr)
+    FakeOcr.loads = []
+    for name in ('a', 'b'):
+        (tmp_path / f'{name}.onnx').write_bytes(b'\0' * 1000)
+        (tmp_path / f'{name}.json').write_text('{}')
+    return ModelRegistry(str(tmp_path), memory_budget=1500)
+
+
+def test_evicts_least_recently_used_idle_model(registry):
+    with registry.acquire('a'):
+        pass
+    with registry.acquire('b'):
+        pass
+    loaded = {item['name']: item['loaded'] for item in registry.status()}
+    assert loaded == {'a': False, 'b': True}
+
+
+def test_in_use_model_is_not_evicted(registry):
+    with registry.acquire('a'):
+        with registry.acquire('b'):
+            # 两个模型都在使用中，暂时超出预算也不淘汰
+            loaded = {item['name']: item['loaded'] for item in registry.status()}
+            assert loaded == {'a': True, 'b': True}
+
+
+def test_ranges_restored_after_eviction(registry):
+    registry.set_ranges('a', '0123456789')
+    with registry.acquire('b'):
+        pass
+    with registry.acquire('a') as ocr:
+        assert ocr.ranges == '0123456789'
+    assert len(FakeOcr.loads) == 3
+
+
+def test_unknown_model(registry):
+    assert not registry.exists('../a')
+    with pytest.raises(ValueError):
+        with registry.acquire('missing'):
+            pass
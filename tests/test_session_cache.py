@@ -0,0 +1,82 @@
+"""
+优化模型缓存测试
+"""
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+import pytest
+
+onnx = pytest.importorskip('onnx')
+onnxruntime = pytest.importorskip('onnxruntime')
+
+from core.session_cache import SessionCache
+
+PROVIDERS = ['CPUExecutionProvider']
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    from onnx import helper, TensorProto
+    x = helper.make_tensor_value_info('x', TensorProto.FLOAT, [1, 4])
+    y = helper.make_tensor_value_info('y', TensorProto.FLOAT, [1, 4])
+    graph = helper.make_graph([
+        helper.make_node('Relu', ['x'], ['a']),
+        helper.make_node('Identity', ['a'], ['y']),
+    ], 'g', [x], [y])
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)])
+    model.ir_version = 8
+    path = tmp_path / 'm.onnx'
+    onnx.save(model, str(path))
+    return str(path)
+
+
+def _load(cache, path):
+    with cache.patch():
+        session = onnxruntime.InferenceSession(path, providers=PROVIDERS)
+    return session.run(None, {'x': np.array([[-1, 2, -3, 4]], np.float32)})[0]
+
+
+def _cached_models(cache_dir):
+    return sorted(f for f in os.listdir(cache_dir) if f.endswith('.onnx'))
+
+
+def test_second_load_uses_cache(tmp_path, model_path, caplog):
+    cache = SessionCache(str(tmp_path / 'cache'))
+    caplog.set_level(logging.INFO, logger='core.session_cache')
+    first = _load(cache, model_path)
+    second = _load(cache, model_path)
+    np.testing.assert_array_equal(first, second)
+    assert len(_cached_models(cache.cache_dir)) == 1
+    assert '优化并写入缓存' in caplog.records[0].getMessage()
+    assert '从缓存加载' in caplog.records[1].getMessage()
+
+
+def test_hash_sidecar_reused_until_model_changes(tmp_path, model_path):
+    cache = SessionCache(str(tmp_path / 'cache'))
+    _load(cache, model_path)
+    sidecar = next(os.path.join(cache.cache_dir, f) for f in os.listdir(cache.cache_dir) if f.endswith('.hash.json'))
+    with open(sidecar, encoding='utf-8') as f:
+        info = json.load(f)
+
+    # 大小和修改时间不变时直接使用旁路文件中的哈希，不重新计算
+    with open(sidecar, 'w', encoding='utf-8') as f:
+        json.dump({**info, 'sha256': 'fake'}, f)
+    assert cache._model_hash(model_path) == 'fake'
+
+    # 模型文件修改后重新计算
+    os.utime(model_path, ns=(info['mtime_ns'] + 10 ** 9, info['mtime_ns'] + 10 ** 9))
+    assert cache._model_hash(model_path) == info['sha256']
+
+
+def test_patch_only_affects_current_thread(tmp_path, model_path):
+    original = onnxruntime.InferenceSession
+    cache = SessionCache(str(tmp_path / 'cache'))
+    with cache.patch():
+        thread = threading.Thread(target=lambda: onnxruntime.InferenceSession(model_path, providers=PROVIDERS))
+        thread.start()
+        thread.join()
+    assert _cached_models(cache.cache_dir) == []
+    assert onnxruntime.InferenceSession is original
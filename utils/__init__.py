@@ -1,4 +1,5 @@
 # Utils package
 
+from .codec import *
 from .response import *
 from .image_utils import *
@@ -0,0 +1,79 @@
+"""
+请求/响应编解码工具类
+根据 Content-Type / Accept 头在 JSON 与 MessagePack 之间协商
+"""
+import base64
+from typing import Any
+
+import msgpack
+from flask import request
+
+# MessagePack 媒体类型（第一个为响应时使用的类型）
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack', 'application/vnd.msgpack')
+JSON_MIMETYPE = 'application/json'
+
+
+def is_msgpack_request() -> bool:
+    """判断当前请求体是否为MessagePack格式"""
+    return request.mimetype in MSGPACK_MIMETYPES
+
+
+def get_request_data() -> Any:
+    """
+    读取请求体，根据Content-Type自动选择JSON或MessagePack解码
+    MessagePack请求中的图片字段可直接传原始二进制（bin类型）
+    :return: 解码后的请求数据
+    """
+    if is_msgpack_request():
+        body = request.get_data(cache=False)
+        if not body:
+            return None
+        return msgpack.unpackb(body, raw=False)
+    return request.get_json()
+
+
+def wants_msgpack() -> bool:
+    """
+    判断客户端是否希望接收MessagePack响应
+    未明确指定时，响应格式与请求格式保持一致
+    """
+    # 未携带Accept头时best_match返回None，直接沿用请求格式
+    if not request.accept_mimetypes:
+        return is_msgpack_request()
+    if is_msgpack_request():
+        offers = [MSGPACK_MIMETYPE, *MSGPACK_MIMETYPES[1:], JSON_MIMETYPE]
+    else:
+        offers = [JSON_MIMETYPE, *MSGPACK_MIMETYPES]
+    return request.accept_mimetypes.best_match(offers) in MSGPACK_MIMETYPES
+
+
+def pack(data: Any) -> bytes:
+    """
+    MessagePack编码，bytes以bin类型原样输出
+    :param data: 待编码数据
+    :return: 编码后的字节流
+    """
+    return msgpack.packb(data, use_bin_type=True, default=_msgpack_default)
+
+
+def bytes_to_base64(data: Any) -> Any:
+    """
+    将数据中的bytes字段递归转换为base64字符串，用于JSON输出
+    :param data: 待转换数据
+    :return: 转换后的数据
+    """
+    if isinstance(data, (bytes, bytearray)):
+        return base64.b64encode(data).decode('utf-8')
+    if isinstance(data, dict):
+        return {k: bytes_to_base64(v) for k, v in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [bytes_to_base64(v) for v in data]
+    return data
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """处理msgpack无法直接编码的类型（如numpy数值）"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
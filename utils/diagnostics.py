@@ -0,0 +1,179 @@
+"""
+运行时诊断工具类
+提供采样剖析、内存快照对比和线程状态导出，仅在开启调试接口时使用
+"""
+import os
+import sys
+import time
+import threading
+import traceback
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+
+# 采样剖析同一时间只允许一个任务运行
+_profile_lock = threading.Lock()
+# 内存快照基线
+_memory_lock = threading.Lock()
+_memory_baseline: Optional[tracemalloc.Snapshot] = None
+_memory_baseline_filter: Optional[str] = None  # 基线快照使用的文件名过滤，对比时必须一致
+
+
+def _frame_label(frame) -> str:
+    """生成栈帧标签：函数名 (文件名:行号)"""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def sample_stacks(seconds: float, interval: float = 0.005) -> Optional[Dict]:
+    """
+    对所有线程进行定时栈采样，输出火焰图可用的折叠栈格式
+    :param seconds: 采样时长（秒）
+    :param interval: 采样间隔（秒）
+    :return: 采样结果，已有采样任务时返回None
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    try:
+        self_ident = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        stacks = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == self_ident:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(ident, str(ident)))
+                stacks[';'.join(reversed(labels))] += 1
+            samples += 1
+            time.sleep(interval)
+        return {
+            'seconds': seconds,
+            'interval': interval,
+            'samples': samples,
+            'folded': [f"{stack} {count}" for stack, count in stacks.most_common()],
+        }
+    finally:
+        _profile_lock.release()
+
+
+def _snapshot(filter_pattern: Optional[str]) -> tracemalloc.Snapshot:
+    """获取内存快照，并排除tracemalloc自身的分配"""
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ]
+    if filter_pattern:
+        filters.append(tracemalloc.Filter(True, filter_pattern))
+    return tracemalloc.take_snapshot().filter_traces(filters)
+
+
+def _format_stat(stat) -> Dict:
+    """将tracemalloc统计项转换为字典"""
+    item = {
+        'traceback': [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+        'size': stat.size,
+        'count': stat.count,
+    }
+    if hasattr(stat, 'size_diff'):
+        item['size_diff'] = stat.size_diff
+        item['count_diff'] = stat.count_diff
+    return item
+
+
+def memory_start(frames: int = 10) -> Dict:
+    """
+    开启tracemalloc内存追踪
+    :param frames: 每次分配保留的栈深度
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        return memory_status()
+    result = memory_status()
+    if frames != result['frames']:
+        result['warning'] = f"内存追踪已开启，栈深度保持为 {result['frames']}，忽略 frames={frames}（需先stop再start）"
+    return result
+
+
+def memory_stop() -> Dict:
+    """关闭内存追踪并清空基线快照"""
+    global _memory_baseline, _memory_baseline_filter
+    with _memory_lock:
+        _memory_baseline = None
+        _memory_baseline_filter = None
+        tracemalloc.stop()
+    return memory_status()
+
+
+def memory_status() -> Dict:
+    """获取内存追踪状态"""
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        'tracing': tracemalloc.is_tracing(),
+        'frames': tracemalloc.get_traceback_limit(),
+        'current': current,
+        'peak': peak,
+        'has_baseline': _memory_baseline is not None,
+        'baseline_filter': _memory_baseline_filter,
+    }
+
+
+def memory_snapshot(limit: int = 20, key_type: str = 'lineno', filter_pattern: Optional[str] = None) -> Dict:
+    """
+    获取内存快照并设为新的基线，返回占用最多的分配位置
+    :param limit: 返回条数
+    :param key_type: 统计方式（lineno、filename、traceback）
+    :param filter_pattern: 文件名过滤，如 "*/core/captcha.py"
+    """
+    global _memory_baseline, _memory_baseline_filter
+    if not tracemalloc.is_tracing():
+        raise ValueError("内存追踪未开启")
+    with _memory_lock:
+        snapshot = _snapshot(filter_pattern)
+        _memory_baseline = snapshot
+        _memory_baseline_filter = filter_pattern
+    stats = snapshot.statistics(key_type)
+    return {**memory_status(), 'top': [_format_stat(stat) for stat in stats[:limit]]}
+
+
+def memory_diff(limit: int = 20, key_type: str = 'lineno', filter_pattern: Optional[str] = None) -> Dict:
+    """
+    获取当前内存快照并与基线对比，返回增长最多的分配位置，并将当前快照设为新的基线
+    :param limit: 返回条数
+    :param key_type: 统计方式（lineno、filename、traceback）
+    :param filter_pattern: 文件名过滤，为空时沿用基线的过滤条件，与基线不一致时报错
+    """
+    global _memory_baseline
+    if not tracemalloc.is_tracing():
+        raise ValueError("内存追踪未开启")
+    with _memory_lock:
+        if _memory_baseline is None:
+            raise ValueError("尚未获取基线快照")
+        if filter_pattern and filter_pattern != _memory_baseline_filter:
+            raise ValueError(f"filter与基线快照不一致: {filter_pattern} != {_memory_baseline_filter}，请重新获取基线快照")
+        snapshot = _snapshot(_memory_baseline_filter)
+        stats = snapshot.compare_to(_memory_baseline, key_type)
+        _memory_baseline = snapshot
+    return {**memory_status(), 'top': [_format_stat(stat) for stat in stats[:limit]]}
+
+
+def thread_states() -> List[Dict]:
+    """导出所有线程的状态和当前调用栈"""
+    frames = sys._current_frames()
+    result = []
+    for thread in threading.enumerate():
+        frame = frames.get(thread.ident)
+        result.append({
+            'name': thread.name,
+            'ident': thread.ident,
+            'native_id': thread.native_id,
+            'daemon': thread.daemon,
+            'alive': thread.is_alive(),
+            'stack': traceback.format_stack(frame) if frame is not None else [],
+        })
+    return result
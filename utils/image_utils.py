@@ -35,6 +35,18 @@ def get_image_bytes(image_data: Union[str, bytes]) -> bytes:
         raise ValueError("Unsupported image data type")
 
 
+def image_to_bytes(image: Image.Image, format: str = 'PNG') -> bytes:
+    """
+    将PIL图片转换为字节流
+    :param image: PIL图片对象
+    :param format: 图片格式
+    :return: 图片字节流
+    """
+    buffered = BytesIO()
+    image.save(buffered, format=format)
+    return buffered.getvalue()
+
+
 def image_to_base64(image: Image.Image, format: str = 'PNG') -> str:
     """
     将PIL图片转换为base64字符串
@@ -42,7 +54,5 @@ def image_to_base64(image: Image.Image, format: str = 'PNG') -> str:
     :param format: 图片格式
     :return: base64编码字符串
     """
-    buffered = BytesIO()
-    image.save(buffered, format=format)
-    img_str = base64.b64encode(buffered.getvalue()).decode('utf-8')
+    img_str = base64.b64encode(image_to_bytes(image, format)).decode('utf-8')
     return img_str
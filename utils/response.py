@@ -2,9 +2,11 @@
 标准化响应工具类
 参考 Java R 类实现统一响应格式
 """
-from flask import jsonify
+from flask import jsonify, Response
 from typing import Any, Optional, Dict
 
+from .codec import MSGPACK_MIMETYPE, bytes_to_base64, pack, wants_msgpack
+
 
 class R(dict):
     """统一响应格式类"""
@@ -87,5 +89,13 @@ class R(dict):
         return dict(self)
 
     def json(self):
-        """转换为Flask JSON响应"""
-        return jsonify(self.to_dict())
+        """转换为Flask JSON响应（bytes字段输出为base64字符串）"""
+        return jsonify(bytes_to_base64(self.to_dict()))
+
+    def msgpack(self) -> Response:
+        """转换为Flask MessagePack响应（bytes字段输出为原始二进制）"""
+        return Response(pack(self.to_dict()), mimetype=MSGPACK_MIMETYPE)
+
+    def response(self):
+        """根据请求的Accept/Content-Type头协商，返回JSON或MessagePack响应"""
+        return self.msgpack() if wants_msgpack() else self.json()